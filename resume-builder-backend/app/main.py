@@ -1,7 +1,8 @@
 from fastapi.responses import FileResponse, JSONResponse
 import os
-import json
-import re
+import orjson
+import asyncio
+import io
 import logging
 from fastapi import (
     FastAPI,
@@ -10,17 +11,20 @@ from fastapi import (
     Depends,
     Request,
     Form,
-    BackgroundTasks,
     HTTPException
 )
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
 from app.utils import cleanup
-from app.config import TEMP_DIR, UI_URL
+from app.config import TEMP_DIR, UI_URL, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE
 
 # Import enhanced utilities
 from app.utils import file_parser  # Use your original parser
-from app.utils.llm_handler import EnhancedLLMHandler
+from app.utils.llm_handler import EnhancedLLMHandler, aclose as close_llm_http_client
 from app.utils.pdf_generator import EnhancedPDFGenerator
+from app.utils.batch import BatchProcessor
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +39,26 @@ app = FastAPI(
     version="2.0.0"
 )
 
+# Routes that accept a file upload
+_UPLOAD_PATHS = frozenset({"/api/upload", "/preview"})
+# Headroom over MAX_UPLOAD_BYTES for multipart boundaries, part headers and the small form fields;
+# _read_upload enforces the exact limit on the file itself
+_MULTIPART_SLACK = 1024 * 1024
+
+def _content_length_exceeded(request: Request) -> bool:
+    """Check the declared request size before touching the upload body."""
+    content_length = request.headers.get("content-length")
+    return (content_length is not None and content_length.isdigit()
+            and int(content_length) > MAX_UPLOAD_BYTES + _MULTIPART_SLACK)
+
+# Registered before CORSMiddleware so it sits inside it and its 413 still carries CORS headers
+@app.middleware("http")
+async def reject_oversized_requests(request: Request, call_next):
+    """Reject oversized bodies from the Content-Length header before multipart parsing spools them."""
+    if request.method == "POST" and request.url.path in _UPLOAD_PATHS and _content_length_exceeded(request):
+        return JSONResponse({"error": "Uploaded file is too large"}, status_code=413)
+    return await call_next(request)
+
 # CORS setup
 origins = [
     UI_URL
@@ -51,13 +75,42 @@ app.add_middleware(
 # Initialize enhanced components
 llm_handler = EnhancedLLMHandler()
 pdf_generator = EnhancedPDFGenerator()
+llm_batcher = BatchProcessor(llm_handler)
+
+cleanup_sweeper = None
+
+@app.on_event("startup")
+async def start_background_workers():
+    global cleanup_sweeper
+    llm_batcher.start()
+    cleanup_sweeper = asyncio.create_task(cleanup.run_sweeper())
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await llm_batcher.stop()
+    await close_llm_http_client()
+    if cleanup_sweeper:
+        cleanup_sweeper.cancel()
+    cleanup.sweep_pending()
+
+_ALLOWED_EXTENSIONS = frozenset({".pdf", ".docx"})
+
+async def _read_upload(file: UploadFile) -> io.BytesIO:
+    """Read an upload into memory in bounded chunks so parsers can work on the buffer directly."""
+    buffer = io.BytesIO()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        if buffer.tell() + len(chunk) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Uploaded file is too large")
+        buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
 
 @app.head("/health")
 async def health_check_head():
     return
 
 @app.get("/system-check")
-async def system_check():
+async def system_check(db: AsyncSession = Depends(get_db)):
     """Check system requirements and dependencies."""
     checks = {}
     
@@ -72,6 +125,13 @@ async def system_check():
     except Exception as e:
         checks["temp_dir"] = {"status": "error", "message": str(e)}
     
+    # Check database connectivity
+    try:
+        await db.execute(text("SELECT 1"))
+        checks["database"] = {"status": "ok"}
+    except Exception as e:
+        checks["database"] = {"status": "error", "message": str(e)}
+    
     overall_status = "ok" if all(check["status"] == "ok" for check in checks.values()) else "error"
     
     return {
@@ -82,14 +142,13 @@ async def system_check():
 @app.post("/api/upload")
 async def upload_resume(
     request: Request,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user_input: str = Form(None),
     target_role: str = Form(...)
 ):
     """Enhanced resume upload and processing endpoint."""
     
-    logger.info(f"[UPLOAD] Processing file: {file.filename}")
+    logger.info("[UPLOAD] Processing file: %s", file.filename)
     
     try:
         # Validate file type
@@ -97,43 +156,29 @@ async def upload_resume(
             raise HTTPException(status_code=400, detail="No filename provided")
         
         ext = os.path.splitext(file.filename)[1].lower()
-        logger.info(f"[UPLOAD] File extension: {ext}")
+        logger.debug("[UPLOAD] File extension: %s", ext)
         
-        if ext not in [".pdf", ".docx"]:
-            logger.warning(f"[UPLOAD] Unsupported file type: {ext}")
+        if ext not in _ALLOWED_EXTENSIONS:
+            logger.warning("[UPLOAD] Unsupported file type: %s", ext)
             return JSONResponse(
                 {"error": "Unsupported file type. Please upload PDF or DOCX files only."}, 
                 status_code=400
             )
         
-        # Create temp file path with unique name to avoid conflicts
-        import uuid
-        unique_filename = f"{uuid.uuid4()}_{file.filename}"
-        temp_path = os.path.join(TEMP_DIR, unique_filename)
-        
-        # Ensure temp directory exists
-        os.makedirs(TEMP_DIR, exist_ok=True)
-        
-        # Save uploaded file
-        logger.info(f"[UPLOAD] Saving temp file: {temp_path}")
-        with open(temp_path, "wb") as f:
-            content = await file.read()
-            if not content:
-                raise HTTPException(status_code=400, detail="Empty file uploaded")
-            f.write(content)
+        # Read uploaded file into memory (parsers accept file-like objects)
+        logger.debug("[UPLOAD] Reading upload into memory")
+        upload = await _read_upload(file)
+        if not upload.getbuffer().nbytes:
+            raise HTTPException(status_code=400, detail="Empty file uploaded")
         
         # Parse file with enhanced parser
-        logger.info("[UPLOAD] Parsing file with enhanced parser...")
+        logger.debug("[UPLOAD] Parsing file with enhanced parser...")
         try:
-            # With this:
-            if ext == ".pdf":
-                text = file_parser.parse_pdf(temp_path)
-            else:
-                text = file_parser.parse_docx(temp_path)
+            # Off the event loop, so other requests' LLM round-trips keep progressing while this parses
+            text = await asyncio.to_thread(file_parser.parse_resume, upload, ext)
             
             if not text or len(text.strip()) < 50:
                 logger.warning("[UPLOAD] Very little text extracted from file")
-                cleanup.cleanup_file(temp_path)
                 return JSONResponse(
                     {
                         "error": "Unable to extract sufficient text from the file. Please ensure the file is not corrupted or image-based.",
@@ -142,36 +187,32 @@ async def upload_resume(
                 )
                 
         except Exception as e:
-            logger.error(f"[UPLOAD] File parsing failed: {str(e)}")
-            cleanup.cleanup_file(temp_path)
+            logger.error("[UPLOAD] File parsing failed: %s", e)
             return JSONResponse(
                 {"error": f"File parsing failed: {str(e)}"}, 
                 status_code=500
             )
         
         # Process with enhanced LLM handler
-        logger.info("[UPLOAD] Processing with enhanced LLM...")
+        logger.debug("[UPLOAD] Processing with enhanced LLM...")
         try:
-            llm_response = llm_handler.call_llm_with_resume(text, user_input or "", target_role)
-            logger.info("[UPLOAD] LLM processing completed successfully")
+            llm_response = await llm_batcher.submit(text, user_input or "", target_role)
+            logger.debug("[UPLOAD] LLM processing completed successfully")
             
         except Exception as e:
-            logger.error(f"[UPLOAD] LLM processing failed: {str(e)}")
-            cleanup.cleanup_file(temp_path)
+            logger.error("[UPLOAD] LLM processing failed: %s", e)
             return JSONResponse(
                 {"error": f"AI processing failed: {str(e)}"}, 
                 status_code=500
             )
         
-        # Clean up temp file
-        cleanup.cleanup_file(temp_path)
-        
         # Parse JSON response
         try:
-            parsed_json = json.loads(llm_response)
-            logger.info(f"[UPLOAD] Successfully parsed JSON with keys: {list(parsed_json.keys())}")
-        except json.JSONDecodeError as e:
-            logger.error(f"[UPLOAD] JSON parsing failed: {str(e)}")
+            parsed_json = orjson.loads(llm_response)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[UPLOAD] Successfully parsed JSON with keys: %s", list(parsed_json.keys()))
+        except orjson.JSONDecodeError as e:
+            logger.error("[UPLOAD] JSON parsing failed: %s", e)
             return JSONResponse(
                 {
                     "error": "Invalid response format from AI processing", 
@@ -181,9 +222,9 @@ async def upload_resume(
             )
         
         # Generate PDF with enhanced generator
-        logger.info("[UPLOAD] Generating PDF with enhanced generator...")
+        logger.debug("[UPLOAD] Generating PDF with enhanced generator...")
         try:
-            pdf_path, log_output = pdf_generator.render_resume_to_pdf(
+            pdf_path, log_output = await pdf_generator.arender_resume_to_pdf(
                 parsed_json, 
                 TEMP_DIR, 
                 return_log=True
@@ -200,20 +241,20 @@ async def upload_resume(
                     status_code=500
                 )
             
-            logger.info(f"[UPLOAD] PDF generated successfully: {pdf_path}")
+            logger.info("[UPLOAD] PDF generated successfully: %s", pdf_path)
             
         except Exception as e:
-            logger.error(f"[UPLOAD] PDF generation exception: {str(e)}")
+            logger.error("[UPLOAD] PDF generation exception: %s", e)
             return JSONResponse(
                 {"error": f"PDF generation failed: {str(e)}"}, 
                 status_code=500
             )
         
-        # Schedule cleanup
-        background_tasks.add_task(cleanup.cleanup_file, pdf_path)
+        # Queue for the periodic cleanup sweep
+        cleanup.schedule_cleanup(pdf_path)
         
         # Return PDF file
-        logger.info("[UPLOAD] Returning PDF file")
+        logger.debug("[UPLOAD] Returning PDF file")
         return FileResponse(
             path=pdf_path,
             filename=f"resume_{file.filename.split('.')[0]}.pdf",
@@ -223,7 +264,7 @@ async def upload_resume(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"[UPLOAD] Unexpected error: {str(e)}")
+        logger.error("[UPLOAD] Unexpected error: %s", e)
         return JSONResponse(
             {"error": f"An unexpected error occurred: {str(e)}"}, 
             status_code=500
@@ -237,7 +278,7 @@ async def preview_resume_data(
 ):
     """Preview extracted resume data without generating PDF."""
     
-    logger.info(f"[PREVIEW] Processing file: {file.filename}")
+    logger.info("[PREVIEW] Processing file: %s", file.filename)
     
     try:
         # Validate and parse file (similar to upload but return JSON data)
@@ -245,36 +286,30 @@ async def preview_resume_data(
             raise HTTPException(status_code=400, detail="No filename provided")
         
         ext = os.path.splitext(file.filename)[1].lower()
-        if ext not in [".pdf", ".docx"]:
+        if ext not in _ALLOWED_EXTENSIONS:
             return JSONResponse(
                 {"error": "Unsupported file type"}, 
                 status_code=400
             )
         
-        # Save and parse file
-        import uuid
-        unique_filename = f"{uuid.uuid4()}_{file.filename}"
-        temp_path = os.path.join(TEMP_DIR, unique_filename)
-        
-        os.makedirs(TEMP_DIR, exist_ok=True)
-        
-        with open(temp_path, "wb") as f:
-            f.write(await file.read())
+        # Read and parse file from memory
+        upload = await _read_upload(file)
         
         # Parse with enhanced parser
-        if ext == ".pdf":
-            text, extraction_info = file_parser.parse_pdf(temp_path)
-        else:
-            text, extraction_info = file_parser.parse_docx(temp_path)
-        
-        # Process with LLM
-        llm_response = llm_handler.call_llm_with_resume(text, user_input or "")
+        text = await asyncio.to_thread(file_parser.parse_resume, upload, ext)
         
-        # Clean up
-        cleanup.cleanup_file(temp_path)
+        # Process with LLM, extracting contact info in a worker thread meanwhile
+        contact_info, llm_response = await asyncio.gather(
+            asyncio.to_thread(file_parser.extract_contact_info, text),
+            llm_batcher.submit(text, user_input or "")
+        )
+        extraction_info = {
+            "characters": len(text),
+            "contact_info": contact_info
+        }
         
         # Return structured data
-        parsed_json = json.loads(llm_response)
+        parsed_json = orjson.loads(llm_response)
         
         return JSONResponse({
             "status": "success",
@@ -282,8 +317,10 @@ async def preview_resume_data(
             "resume_data": parsed_json
         })
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"[PREVIEW] Error: {str(e)}")
+        logger.error("[PREVIEW] Error: %s", e)
         return JSONResponse(
             {"error": f"Preview generation failed: {str(e)}"}, 
             status_code=500
@@ -291,4 +328,12 @@ async def preview_resume_data(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=7777)
\ No newline at end of file
+    # Multiple workers need an import string; "auto" picks uvloop/httptools when installed
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=7777,
+        workers=max(2, os.cpu_count() or 1),
+        loop="auto",
+        http="auto"
+    )
\ No newline at end of file
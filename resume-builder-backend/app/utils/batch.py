@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+class BatchProcessor:
+    """
+    Queue LLM requests and dispatch them with bounded concurrency.
+
+    Requests that arrive together are drained in one pass (up to
+    ``max_batch_size``) and each gets its own call, resolving as soon as that
+    call finishes. At most ``max_concurrency`` LLM calls run at once; further
+    calls wait for a free slot.
+    """
+
+    def __init__(self, handler, max_batch_size: int = 8, max_concurrency: int = 32):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def start(self):
+        """Start the background consumer (call from the app startup hook)."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the consumer and fail any requests still waiting in the queue."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            self._fail(future)
+
+    @staticmethod
+    def _fail(future: asyncio.Future):
+        if not future.done():
+            future.set_exception(RuntimeError("LLM batch processor stopped"))
+
+    async def submit(self, resume_text: str, update_text: str = "", target_role: str = "") -> str:
+        """Enqueue one resume and wait for its LLM response."""
+        if self._worker is None:
+            # Not started (e.g. used outside the app): call straight through
+            return await self.handler.call_llm_with_resume(resume_text, update_text, target_role)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((resume_text, update_text, target_role), future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            logger.debug("Dispatching LLM batch of %d request(s)", len(batch))
+            for args, future in batch:
+                task = asyncio.create_task(self._call(args))
+                task.add_done_callback(partial(self._resolve, future))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _call(self, args: Tuple[str, str, str]) -> str:
+        # The slot is held per call, not per batch, so the limit bounds real LLM
+        # concurrency and a slow request never keeps a finished one's slot busy
+        async with self._semaphore:
+            return await self.handler.call_llm_with_resume(*args)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, task: asyncio.Task):
+        if future.done():
+            return
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
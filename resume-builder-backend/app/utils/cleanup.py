@@ -1,9 +1,14 @@
 import os
+import time
+import asyncio
 import logging
-from typing import Union, List
+from typing import Dict, Union, List
 
 logger = logging.getLogger(__name__)
 
+# Files queued for deletion by the background sweeper, mapped to when they were queued
+_PENDING: Dict[str, float] = {}
+
 def cleanup_file(file_paths: Union[str, List[str]]):
     """
     Clean up one or more files efficiently.
@@ -15,8 +20,32 @@ def cleanup_file(file_paths: Union[str, List[str]]):
     
     for file_path in file_paths:
         try:
-            if os.path.exists(file_path):
-                os.unlink(file_path)
-                logger.debug(f"Cleaned up file: {file_path}")
-        except Exception as e:
-            logger.warning(f"Failed to delete temp file {file_path}: {e}")
+            os.unlink(file_path)
+            logger.debug("Cleaned up file: %s", file_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Failed to delete temp file %s: %s", file_path, e)
+
+def schedule_cleanup(file_path: str):
+    """Queue a file for deletion on the next sweep instead of scheduling a task per file."""
+    _PENDING[file_path] = time.monotonic()
+
+def sweep_pending(min_age: float = 0.0):
+    """Delete queued files that have been pending for at least ``min_age`` seconds."""
+    now = time.monotonic()
+    due = [path for path, queued_at in _PENDING.items() if now - queued_at >= min_age]
+    for path in due:
+        _PENDING.pop(path, None)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Failed to delete temp file %s: %s", path, e)
+
+async def run_sweeper(interval: float = 5.0):
+    """Periodically delete queued files; the age check leaves in-flight responses alone."""
+    while True:
+        await asyncio.sleep(interval)
+        sweep_pending(interval)
@@ -1,146 +1,425 @@
 import pdfplumber
+import pypdfium2 as pdfium
 import docx
+import io
 import re
-from typing import Dict, List, Optional
+import hashlib
+import mmap
+import multiprocessing
+import zipfile
+from lxml import etree
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+from typing import IO, Dict, List, Optional, Tuple, Union
 import logging
 
+try:
+    import re2  # google-re2: linear-time DFA matching
+except ImportError:
+    re2 = None
+
 logger = logging.getLogger(__name__)
 
+def _compile(pattern: str):
+    r"""
+    Compile with RE2 when it is installed and accepts the pattern, else stdlib re.
+    RE2's \w, \d and \b are ASCII-only, so the fallback uses re.ASCII to match the same text;
+    patterns spell out whitespace classes, since RE2's \s also leaves out \v.
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern, re.ASCII)
+
+def _ascii_nocase(literal: str) -> str:
+    """Pattern for ``literal`` with ASCII letters in either case ((?i) under RE2 also folds e.g. U+212A to k)."""
+    return "".join(f"[{c.upper()}{c.lower()}]" if c.isascii() and c.isalpha() else re.escape(c) for c in literal)
+
+# LaTeX escapes applied in one str.translate pass (order-independent)
+_LATEX_TABLE = str.maketrans({
+    "&": r"\&",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+    "\\": r"\textbackslash{}",
+    "%": r"\%",
+})
+
+# WordprocessingML tags used by the fast DOCX path
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_BODY = _W_NS + "body"
+_W_P = _W_NS + "p"
+_W_T = _W_NS + "t"
+_W_TBL = _W_NS + "tbl"
+_W_TR = _W_NS + "tr"
+_W_TC = _W_NS + "tc"
+_W_R = _W_NS + "r"
+_W_VAL = _W_NS + "val"
+_W_GRID_BEFORE = _W_NS + "trPr/" + _W_NS + "gridBefore"
+_W_GRID_SPAN = _W_NS + "tcPr/" + _W_NS + "gridSpan"
+_W_V_MERGE = _W_NS + "tcPr/" + _W_NS + "vMerge"
+_W_RUN_BREAKS = {_W_NS + "tab": "\t", _W_NS + "br": "\n", _W_NS + "cr": "\n"}
+
+_MULTI_NL_RE = _compile(r'\n{3,}')
+
+# Worker processes for multi-page pdfplumber extraction, created on first use
+_PAGE_POOL: Optional[ProcessPoolExecutor] = None
+_PAGE_POOL_LOCK = threading.Lock()
+# Never fork: forking this multithreaded server process (event loop, to_thread workers) can deadlock.
+# forkserver where the platform has it (POSIX), spawn otherwise (Windows)
+_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# PDFium is not thread-safe; parse_resume runs in worker threads, so every pypdfium2 call holds this
+_PDFIUM_LOCK = threading.Lock()
+
+# Parsed text keyed by (sha256 of file bytes, extension, latex_ready), least recently used first
+_PARSE_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_PARSE_CACHE_SIZE = 512
+_PARSE_CACHE_LOCK = threading.Lock()
+
+# Files at least this large are memory-mapped rather than read into memory
+_MMAP_THRESHOLD = 8 * 1024 * 1024
+
+# Single alternation so contact extraction scans the text once
+_CONTACT_RE = _compile(
+    r'(?P<emails>\b[\w.%+-]+@[\w.-]+\.[A-Za-z]{2,24}\b)'
+    rf'|(?P<linkedin>{_ascii_nocase("linkedin.com/in/")}[^ \t\n\r\f\v]+)'
+    rf'|(?P<github>{_ascii_nocase("github.com/")}[^ \t\n\r\f\v]+)'
+    r'|(?P<phones>\(\d{3}\)[ \t\n\r\f\v]*\d{3}[-. \t\n\r\f\v]?\d{4}'
+    r'|\b\d{3}[-. \t\n\r\f\v]?\d{3}[-. \t\n\r\f\v]?\d{4}\b)'
+)
+
 def clean_text(text: str) -> str:
     """Basic text cleanup with whitespace normalization."""
     if not text:
         return ""
     try:
-        # Split into lines and normalize spaces
-        lines = [' '.join(line.split()) for line in text.split('\n')]
-        cleaned_lines = [line for line in lines if line.strip()]
+        # Normalize spaces per line and drop blank lines in one pass
+        result = '\n'.join(line for line in (' '.join(raw.split()) for raw in text.split('\n')) if line)
         # Reduce multiple newlines
-        result = '\n'.join(cleaned_lines)
-        while '\n\n\n' in result:
-            result = result.replace('\n\n\n', '\n\n')
+        result = _MULTI_NL_RE.sub('\n\n', result)
         return result.strip()
     except Exception as e:
-        logger.warning(f"Text cleaning failed: {e}")
+        logger.warning("Text cleaning failed: %s", e)
         return text.strip()
 
 def clean_for_latex(text: str) -> str:
-    """Escapes LaTeX special characters but keeps % as \%."""
+    """Escapes LaTeX special characters (including %) in a single translate pass."""
     if not isinstance(text, str):
         return text
-    special_chars = {
-        "&": r"\&",
-        "$": r"\$",
-        "#": r"\#",
-        "_": r"\_",
-        "{": r"\{",
-        "}": r"\}",
-        "~": r"\textasciitilde{}",
-        "^": r"\textasciicircum{}",
-        "\\": r"\textbackslash{}"
-    }
-    for char, escaped in special_chars.items():
-        text = text.replace(char, escaped)
-    # Escape % last
-    text = text.replace("%", r"\%")
-    return text
+    return text.translate(_LATEX_TABLE)
 
 def extract_contact_info(text: str) -> Dict[str, List[str]]:
     """Extract email, phone, LinkedIn, GitHub links."""
     contact_info = {}
     try:
-        emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
-        if emails:
-            contact_info['emails'] = sorted(set(emails))
-
-        phones = []
-        phone_patterns = [
-            r'\b\d{10}\b',  # 10 digits
-            r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',
-            r'\(\d{3}\)\s*\d{3}[-.\s]?\d{4}'
-        ]
-        for pattern in phone_patterns:
-            phones.extend(re.findall(pattern, text))
-        if phones:
-            cleaned_phones = []
-            for phone in phones:
-                digits = re.sub(r'\D', '', phone)
-                if len(digits) == 10:
-                    cleaned_phones.append(phone.strip())
-            contact_info['phones'] = sorted(set(cleaned_phones))
-
-        linkedin_matches = re.findall(r'linkedin\.com/in/[^\s]+', text, re.IGNORECASE)
-        if linkedin_matches:
-            contact_info['linkedin'] = sorted(set(linkedin_matches))
-
-        github_matches = re.findall(r'github\.com/[^\s]+', text, re.IGNORECASE)
-        if github_matches:
-            contact_info['github'] = sorted(set(github_matches))
+        # Dicts dedupe while keeping first-seen order (the canonical email usually comes first)
+        buckets: Dict[str, Dict[str, None]] = {}
+        # Every phone alternative already matches exactly 10 digits, so no digit re-count is needed
+        for match in _CONTACT_RE.finditer(text):
+            buckets.setdefault(match.lastgroup, {})[match.group().strip()] = None
+        for key in ('emails', 'phones', 'linkedin', 'github'):
+            if key in buckets:
+                contact_info[key] = list(buckets[key])
 
     except Exception as e:
-        logger.warning(f"Contact extraction failed: {e}")
+        logger.warning("Contact extraction failed: %s", e)
         contact_info['extraction_error'] = str(e)
 
     return contact_info
 
-def parse_pdf(file_path: str, latex_ready: bool=False) -> str:
-    """Parse PDF and optionally return LaTeX-safe text."""
+def _get_max_workers() -> int:
+    return max(1, min(4, os.cpu_count() or 1))
+
+def _page_pool() -> ProcessPoolExecutor:
+    """Lazily create the process pool shared by all multi-page extractions."""
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is None:
+            _PAGE_POOL = ProcessPoolExecutor(max_workers=_get_max_workers(),
+                                             mp_context=multiprocessing.get_context(_POOL_START_METHOD))
+        return _PAGE_POOL
+
+def _reset_page_pool():
+    global _PAGE_POOL
+    with _PAGE_POOL_LOCK:
+        if _PAGE_POOL is not None:
+            _PAGE_POOL.shutdown(wait=False)
+            _PAGE_POOL = None
+
+def _pdf_source(file_path: Union[str, IO[bytes]]) -> Union[str, bytes]:
+    """Normalize the input to something each page worker can reopen independently."""
+    if isinstance(file_path, str):
+        return file_path
+    if hasattr(file_path, "getvalue"):
+        return file_path.getvalue()
+    file_path.seek(0)
+    return file_path.read()
+
+@contextmanager
+def _open_pdf(source: Union[str, bytes], pages: Optional[List[int]] = None):
+    """Open with pdfplumber; large files on disk are memory-mapped so pages load lazily."""
+    if isinstance(source, bytes):
+        with pdfplumber.open(io.BytesIO(source), pages=pages) as pdf:
+            yield pdf
+    elif os.path.getsize(source) >= _MMAP_THRESHOLD:
+        with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with pdfplumber.open(mm, pages=pages) as pdf:
+                yield pdf
+    else:
+        with pdfplumber.open(source, pages=pages) as pdf:
+            yield pdf
+
+def _render_page(page, page_num: int) -> str:
+    """Extract text (plus table data when the page text is sparse) from one page."""
+    # Image-only (scanned) pages have no characters; skip extraction and table detection
+    if not page.chars:
+        logger.warning("Page %d has no text layer (scanned image), skipping", page_num)
+        return ""
+    parts = []
+    # Extract once and reuse; tables are only searched when the text is sparse
+    page_text = page.extract_text() or ""
+    if len(page_text.strip()) < 20:
+        try:
+            page_text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+        except Exception as e:
+            logger.warning("Alt extraction failed on page %d: %s", page_num, e)
+            page_text = ""
+    if page_text.strip():
+        parts.append(f"\n=== PAGE {page_num} ===\n{page_text}\n")
+    # Extract tables if text is sparse
+    if len(page_text.strip()) < 50:
+        try:
+            for table in page.find_tables():
+                table_data = table.extract()
+                if table_data:
+                    table_text = "\n".join([" | ".join([str(c or '') for c in row]) for row in table_data])
+                    parts.append(f"\n[TABLE DATA]\n{table_text}\n")
+        except Exception as e:
+            logger.warning("Table extraction failed page %d: %s", page_num, e)
+    return "".join(parts)
+
+def _extract_pages(source: Union[str, bytes], page_numbers: List[int]) -> str:
+    """Open the document restricted to a run of pages so workers never share a parser."""
+    with _open_pdf(source, pages=page_numbers) as pdf:
+        return "".join(_render_page(page, page.page_number) for page in pdf.pages)
+
+def _pdfplumber_text(source: Union[str, bytes], pages: Optional[List[int]] = None) -> str:
+    """Layout-aware extraction with pdfplumber, including table recovery on sparse pages."""
+    with _open_pdf(source, pages=pages) as pdf:
+        page_numbers = [page.page_number for page in pdf.pages]
+        logger.debug("PDF pages: %d", len(page_numbers))
+        if len(page_numbers) <= 1:
+            return "".join(_render_page(page, page.page_number) for page in pdf.pages)
+    # Extract pages in worker processes (pdfminer is pure Python and GIL-bound); map() keeps page order.
+    # One contiguous run of pages per worker, so an in-memory PDF is pickled once per worker, not per page
+    run = -(-len(page_numbers) // _get_max_workers())
+    runs = [page_numbers[i:i + run] for i in range(0, len(page_numbers), run)]
+    extract = partial(_extract_pages, source)
     try:
-        logger.info(f"Parsing PDF: {file_path}")
-        full_text = ""
-        with pdfplumber.open(file_path) as pdf:
-            logger.info(f"PDF pages: {len(pdf.pages)}")
-            for page_num, page in enumerate(pdf.pages, 1):
-                page_text = page.extract_text() or ""
-                if len(page_text.strip()) < 20:
-                    try:
-                        page_text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
-                    except Exception as e:
-                        logger.warning(f"Alt extraction failed on page {page_num}: {e}")
-                        page_text = ""
-                if page_text.strip():
-                    full_text += f"\n=== PAGE {page_num} ===\n{page_text}\n"
-                # Extract tables if text is sparse
-                if len(page_text.strip()) < 50:
-                    try:
-                        for table in page.find_tables():
-                            table_data = table.extract()
-                            if table_data:
-                                table_text = "\n".join([" | ".join([str(c or '') for c in row]) for row in table_data])
-                                full_text += f"\n[TABLE DATA]\n{table_text}\n"
-                    except Exception as e:
-                        logger.warning(f"Table extraction failed page {page_num}: {e}")
+        pool = _page_pool()
+    except Exception as e:
+        logger.warning("PDF page pool unavailable, extracting sequentially: %s", e)
+        return "".join(map(extract, runs))
+    try:
+        return "".join(pool.map(extract, runs))
+    except BrokenProcessPool as e:
+        logger.warning("PDF page pool broke, extracting sequentially: %s", e)
+        _reset_page_pool()
+        return "".join(map(extract, runs))
+
+def _pdfium_text(source: Union[str, bytes], pages: Optional[List[int]] = None) -> Tuple[str, bool]:
+    """Fast plain-text extraction through PDFium; also reports whether any page has a text layer."""
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            parts = []
+            has_text_layer = False
+            for page_num in pages or range(1, len(pdf) + 1):
+                page = pdf[page_num - 1]
+                textpage = page.get_textpage()
+                if textpage.count_chars():
+                    has_text_layer = True
+                    page_text = textpage.get_text_range()
+                    if page_text.strip():
+                        parts.append(f"\n=== PAGE {page_num} ===\n{page_text}\n")
+                else:
+                    logger.warning("Page %d has no text layer (scanned image), skipping", page_num)
+                textpage.close()
+                page.close()
+            return "".join(parts), has_text_layer
+        finally:
+            pdf.close()
+
+def parse_pdf(file_path: Union[str, IO[bytes]], latex_ready: bool=False, pages: Optional[List[int]] = None) -> str:
+    """Parse PDF (path or binary file-like object) and optionally return LaTeX-safe text.
+
+    ``pages`` restricts extraction to the given 1-based page numbers.
+    """
+    try:
+        logger.debug("Parsing PDF: %s", file_path)
+        source = _pdf_source(file_path)
+        try:
+            full_text, has_text_layer = _pdfium_text(source, pages)
+        except Exception as e:
+            logger.warning("PDFium extraction failed, falling back to pdfplumber: %s", e)
+            full_text, has_text_layer = "", True
+        # Sparse output usually means tables or odd layouts; let pdfplumber have a go,
+        # unless every page is a scanned image with nothing for it to find
+        if len(full_text.strip()) < 50 and has_text_layer:
+            full_text = _pdfplumber_text(source, pages)
         cleaned_text = clean_text(full_text)
         if latex_ready:
             cleaned_text = clean_for_latex(cleaned_text)
         return cleaned_text
     except Exception as e:
-        logger.error(f"PDF parsing failed: {str(e)}")
+        logger.error("PDF parsing failed: %s", e)
         raise
 
-def parse_docx(file_path: str, latex_ready: bool=False) -> str:
-    """Parse DOCX and optionally return LaTeX-safe text."""
+def _w_paragraph_text(paragraph) -> str:
+    """Concatenate run text of a w:p element, honouring in-run tabs and line breaks."""
+    out = []
+    for node in paragraph.iter(_W_T, *_W_RUN_BREAKS):
+        if node.tag == _W_T:
+            out.append(node.text or "")
+        elif node.getparent().tag == _W_R:
+            out.append(_W_RUN_BREAKS[node.tag])
+    return "".join(out)
+
+def _w_int_attr(elem, path: str, default: int) -> int:
+    node = elem.find(path)
+    return int(node.get(_W_VAL, default)) if node is not None else default
+
+def _w_table_text(table, out: List[str]):
+    """Append a w:tbl as [TABLE] block lines, one ' | '-joined line per non-empty row.
+
+    Cells are expanded like python-docx's ``row.cells``: a horizontally merged
+    cell repeats once per grid column it spans, and a vertical-merge
+    continuation repeats the text of the cell above it.
+    """
+    out.append("\n[TABLE]\n")
+    above: Dict[int, str] = {}
+    for row in table.iterfind(_W_TR):
+        cells = []
+        current: Dict[int, str] = {}
+        offset = _w_int_attr(row, _W_GRID_BEFORE, 0)
+        for cell in row.iterfind(_W_TC):
+            span = _w_int_attr(cell, _W_GRID_SPAN, 1)
+            v_merge = cell.find(_W_V_MERGE)
+            if v_merge is not None and v_merge.get(_W_VAL, "continue") == "continue":
+                text = above.get(offset, "")
+            else:
+                text = "\n".join(_w_paragraph_text(p) for p in cell.iterfind(_W_P)).strip()
+            current[offset] = text
+            cells.extend([text] * span)
+            offset += span
+        above = current
+        row_text = " | ".join(cell for cell in cells if cell)
+        if row_text:
+            out.append(row_text + "\n")
+    out.append("[/TABLE]\n\n")
+
+def _docx_text_fast(file_path: Union[str, IO[bytes]]) -> str:
+    """Read body paragraphs and tables straight from word/document.xml without building python-docx objects."""
+    paragraphs = []
+    tables = []
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as document_xml:
+        for _, elem in etree.iterparse(document_xml, events=("end",), tag=(_W_P, _W_TBL)):
+            parent = elem.getparent()
+            # Paragraphs inside tables are handled with their table
+            if parent is None or parent.tag != _W_BODY:
+                continue
+            if elem.tag == _W_P:
+                text = _w_paragraph_text(elem)
+                if text.strip():
+                    paragraphs.append(text + "\n")
+            else:
+                _w_table_text(elem, tables)
+            # Free processed body elements as we go
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+    return "".join(paragraphs) + "".join(tables)
+
+def _docx_text_python_docx(file_path: Union[str, IO[bytes]]) -> str:
+    """Fallback: let python-docx resolve the main document part, then walk its body XML directly."""
+    body = docx.Document(file_path).element.body
+    parts = []
+    for p in body.iterchildren(_W_P):
+        text = _w_paragraph_text(p)
+        if text.strip():
+            parts.append(text + "\n")
+    for table in body.iterchildren(_W_TBL):
+        _w_table_text(table, parts)
+    return "".join(parts)
+
+def parse_docx(file_path: Union[str, IO[bytes]], latex_ready: bool=False) -> str:
+    """Parse DOCX (path or binary file-like object) and optionally return LaTeX-safe text."""
     try:
-        logger.info(f"Parsing DOCX: {file_path}")
-        doc = docx.Document(file_path)
-        full_text = ""
-        for para in doc.paragraphs:
-            if para.text.strip():
-                full_text += para.text + "\n"
-        for table in doc.tables:
-            full_text += "\n[TABLE]\n"
-            for row in table.rows:
-                row_text = " | ".join([cell.text.strip() for cell in row.cells if cell.text.strip()])
-                if row_text:
-                    full_text += row_text + "\n"
-            full_text += "[/TABLE]\n\n"
+        logger.debug("Parsing DOCX: %s", file_path)
+        try:
+            full_text = _docx_text_fast(file_path)
+        except Exception as e:
+            logger.warning("Fast DOCX extraction failed, falling back to python-docx: %s", e)
+            if hasattr(file_path, "seek"):
+                file_path.seek(0)
+            full_text = _docx_text_python_docx(file_path)
         cleaned_text = clean_text(full_text)
         if latex_ready:
             cleaned_text = clean_for_latex(cleaned_text)
         return cleaned_text
     except Exception as e:
-        logger.error(f"DOCX parsing failed: {str(e)}")
+        logger.error("DOCX parsing failed: %s", e)
         raise
 
+def _file_digest(path: str) -> str:
+    """SHA-256 of a file on disk, hashing large files through a read-only memory map."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_THRESHOLD:
+            return hashlib.sha256(f.read()).hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+def parse_resume(file_path: Union[str, IO[bytes]], ext: str, latex_ready: bool=False) -> str:
+    """Parse a PDF/DOCX by extension, reusing the result for byte-identical files."""
+    if isinstance(file_path, str):
+        # Hash and parse straight from disk; no in-memory copy of the file
+        digest = _file_digest(file_path)
+        source = file_path
+    else:
+        data = file_path.getvalue() if hasattr(file_path, "getvalue") else file_path.read()
+        digest = hashlib.sha256(data).hexdigest()
+        source = io.BytesIO(data)
+    ext = ext.lower().lstrip(".")
+    key = (digest, ext, latex_ready)
+    with _PARSE_CACHE_LOCK:
+        if key in _PARSE_CACHE:
+            _PARSE_CACHE.move_to_end(key)
+            logger.info("Parse cache hit")
+            return _PARSE_CACHE[key]
+    if ext == "pdf":
+        text = parse_pdf(source, latex_ready)
+    elif ext == "docx":
+        text = parse_docx(source, latex_ready)
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[key] = text
+        if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return text
+
 def test_parser(file_path: str, latex_ready: bool=False):
     """Test parsing and show sample output with contact info."""
     ext = file_path.lower().split('.')[-1]
@@ -1,104 +1,42 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, BadRequestError
 from app.config import LLM_API_KEY
-import json
+import hashlib
+import httpx
+import logging
+import orjson
 import re
+from collections import OrderedDict
 from typing import Dict, Optional
 
-# SambaNova-compatible OpenAI client
-client = OpenAI(
-    api_key=LLM_API_KEY,
-    base_url="https://api.sambanova.ai/v1",
-)
+logger = logging.getLogger(__name__)
 
-class EnhancedLLMHandler:
-    """Enhanced LLM handler for resume parsing with strict JSON validation and cleanup."""
-    
-    @staticmethod
-    def validate_json_response(response: str) -> tuple[bool, Optional[Dict], str]:
-        """Validate and clean JSON response from LLM."""
-        try:
-            # Try direct parsing first
-            parsed = json.loads(response)
-            return True, parsed, "Valid JSON"
-        except json.JSONDecodeError:
-            pass
-        
-        # Try to extract JSON from markdown code blocks
-        json_match = re.search(r'```(?:json)?\s*(\{.*\})\s*```', response, re.DOTALL)
-        if json_match:
-            try:
-                parsed = json.loads(json_match.group(1))
-                return True, parsed, "JSON extracted from markdown"
-            except json.JSONDecodeError:
-                pass
-        
-        # Try to find JSON-like content
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            try:
-                parsed = json.loads(json_match.group(0))
-                return True, parsed, "JSON pattern extracted"
-            except json.JSONDecodeError:
-                pass
-        
-        return False, None, f"No valid JSON found in response: {response[:200]}..."
+_MODEL = "Meta-Llama-3.3-70B-Instruct"
 
-    @staticmethod
-    def clean_resume_json(parsed_json: dict) -> dict:
-        """Clean and standardize the LLM JSON output."""
-        
-        # Normalize education fields
-        for edu in parsed_json.get("education", []):
-            # Standardize GPA format
-            if "gpa" in edu and edu["gpa"]:
-                gpa_str = edu["gpa"].strip()
-                
-                # Convert percentage to X.X/100 format
-                perc_match = re.search(r"(\d+\.?\d*)%", gpa_str)
-                if perc_match:
-                    edu["gpa"] = f"{perc_match.group(1)}/100"
-                
-                # Convert single number to /10 scale
-                elif re.fullmatch(r"\d+\.?\d*", gpa_str):
-                    edu["gpa"] = f"{gpa_str}/10"
-            
-            # Remove honors if it's empty or just GPA-related
-            if "honors" in edu:
-                honors = edu["honors"].strip()
-                if not honors or "cgpa" in honors.lower() or "gpa" in honors.lower():
-                    edu.pop("honors", None)
-        
-        # Remove empty optional fields at the top level
-        for key in ["linkedin", "github", "portfolio"]:
-            if key in parsed_json and (not parsed_json[key] or parsed_json[key].strip() == ""):
-                parsed_json.pop(key, None)
-        
-        return parsed_json
+# Bump whenever the prompt or post-processing changes, so cached responses are invalidated
+PROMPT_VERSION = "1"
 
-    @staticmethod
-    def create_enhanced_prompt(resume_text: str, update_text: str = "", target_role: str = "software engineer") -> str:
-        """Create an ATS-optimized prompt for resume parsing, adaptable to any target role."""
-        
-        # 1. Optional update instructions from user
-        update_section = ""
-        if update_text:
-            update_section = f"""
-IMPORTANT: The user requested these changes:
-{update_text}
-Please incorporate them while keeping accuracy intact.
-"""
+# Cleaned JSON responses keyed by a digest of the request, least recently used first
+_RESPONSE_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_RESPONSE_CACHE_SIZE = 256
 
-        # 2. Prompt now **lets the LLM infer keywords** instead of backend hardcoding
-        prompt = f"""
-You are a professional resume parser and ATS optimization expert.
-Your task is to extract and enhance the resume into a clean, ATS-friendly JSON.
+def _response_cache_key(resume_text: str, update_text: str, target_role: str) -> str:
+    """
+    Digest of the request with whitespace runs collapsed, so a resume that differs
+    only in layout/spacing (e.g. re-exported or re-parsed) reuses the cached response.
+    """
+    fields = (resume_text, update_text or "", target_role or "")
+    payload = "\x00".join((*(" ".join(f.split()) for f in fields), _MODEL, PROMPT_VERSION))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
 
-INPUT RESUME:
----
-{resume_text}
----
+# GPA normalization patterns used by clean_resume_json
+_GPA_PERCENT_RE = re.compile(r"(\d+\.?\d*)%")
+_GPA_NUMBER_RE = re.compile(r"\d+\.?\d*")
 
-{update_section}
+# Invariant instructions and schema, sent as the system message so the same
+# prefix is reused across calls (and can hit server-side prompt caching)
+_SYSTEM_PROMPT = """You are a professional resume parser and ATS optimization expert.
+Your task is to extract and enhance the resume into a clean, ATS-friendly JSON.
+Return only valid JSON without any markdown formatting or explanations.
 
 CRITICAL INSTRUCTIONS:
 
@@ -108,26 +46,25 @@ CRITICAL INSTRUCTIONS:
    - You may rewrite bullet points to emphasize measurable impact and relevant technical skills.
 
 2. ATS OPTIMIZATION:
-   - Target role: {target_role}
-   - **Identify and naturally integrate relevant industry keywords and skills** for this role.
-   - Keywords should align with tools, technologies, and responsibilities common for {target_role}.
+   - **Identify and naturally integrate relevant industry keywords and skills** for the target role.
+   - Keywords should align with tools, technologies, and responsibilities common for the target role.
    - Rewrite summary & experience to highlight **action + impact + metrics**.
    - Skills must be grouped logically by category.
 
 3. CONTENT ENHANCEMENT:
    - Expand each job experience into 3–5 **bullet points** with **action verbs** and **quantifiable metrics**.
    - Project descriptions should highlight **technical stack and outcomes**.
-   - Summary: 2–3 sentences tailored to {target_role}, emphasizing achievements and core strengths.
+   - Summary: 2–3 sentences tailored to the target role, emphasizing achievements and core strengths.
 
 4. EDUCATION & CERTIFICATIONS:
    - GPA must be in X.X/10 or NN.N% format.
    - Include only real honors/awards if mentioned with the degree.
-   - Highlight certifications relevant to {target_role}.
+   - Highlight certifications relevant to the target role.
 
 5. OUTPUT REQUIREMENTS:
    - Return **ONLY valid JSON**, no markdown or extra explanation.
    - JSON schema:
-{{
+{
   "name": "Full legal name",
   "email": "primary@email.com",
   "phone": "formatted phone number",
@@ -135,44 +72,81 @@ CRITICAL INSTRUCTIONS:
   "linkedin": "https://linkedin.com/in/username",
   "github": "https://github.com/username",
   "portfolio": "https://portfolio-url.com",
-  "summary": "Professional summary tailored for {target_role}",
+  "summary": "Professional summary tailored for the target role",
   "skills": [
     "Technical skills grouped logically"
   ],
   "experience": [
-    {{
+    {
       "company": "Company Name",
       "title": "Job Title",
       "duration": "Start Date – End Date",
       "location": "City, State",
       "description": [
-        "Action + metric bullet relevant to {target_role}",
+        "Action + metric bullet relevant to the target role",
         "Another bullet emphasizing impact or technical contribution"
       ]
-    }}
+    }
   ],
   "education": [
-    {{
+    {
       "degree": "Degree Type and Field",
       "institution": "University/School Name",
       "duration": "Start Year – End Year",
       "location": "City, State",
       "gpa": "X.X/10 or NN.N%",
       "honors": "Only real awards/distinctions"
-    }}
+    }
   ],
   "projects": [
-    {{
+    {
       "title": "Project Name",
       "description": "Brief description emphasizing relevant skills and outcomes",
       "tech_stack": "Technologies used (comma-separated)",
       "link": "https://project-url.com"
-    }}
+    }
   ],
   "certifications": [
     "Certification Name (Issuing Organization, Year)"
   ]
-}}
+}
+"""
+
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+
+# Fallback prompt used by _retry_with_simple_prompt, around the truncated resume text
+_SIMPLE_PROMPT_HEAD = """Extract resume information and return as JSON only:
+
+Resume text:
+"""
+
+_SIMPLE_PROMPT_TAIL = """  
+
+Return valid JSON with fields: name, email, phone, location, linkedin, github, summary, skills (array), experience (array with company, title, duration, description array), education (array with gpa and honors), projects (array), certifications (array).
+
+Rules:
+- GPA: X.X/10 or NN.N
+- Honors: Only real awards/distinctions
+- No empty strings, omit missing fields
+
+JSON only, no markdown:"""
+
+# Per-request prompt fragments, formatted and joined in create_enhanced_prompt
+_PROMPT_HEAD = """
+INPUT RESUME:
+---
+{resume_text}
+---
+"""
+
+_UPDATE_SECTION_TEMPLATE = """
+IMPORTANT: The user requested these changes:
+{update_text}
+Please incorporate them while keeping accuracy intact.
+"""
+
+_PROMPT_TAIL_TEMPLATE = """
+TARGET ROLE: {target_role}
 
 QUALITY CHECKLIST:
 - JSON only (no markdown, no extra text)
@@ -181,83 +155,226 @@ QUALITY CHECKLIST:
 - Summary optimized for {target_role}
 - Role-specific keywords included naturally
 """
-        return prompt
 
-    def call_llm_with_resume(self, resume_text: str, update_text: str = "", target_role: str = "") -> str:
+# Whole user prompt as one template, so each request is a single format_map into one new string
+_USER_PROMPT_TEMPLATE = _PROMPT_HEAD + "{update_section}" + _PROMPT_TAIL_TEMPLATE
+
+# Shared HTTP client so every LLM call reuses warm keep-alive connections
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+    timeout=httpx.Timeout(120.0),
+    http2=True,
+)
+
+# SambaNova-compatible OpenAI client
+client = AsyncOpenAI(
+    api_key=LLM_API_KEY,
+    base_url="https://api.sambanova.ai/v1",
+    http_client=http_client,
+)
+
+def _balanced_object(text: str, start: int) -> Optional[str]:
+    """
+    Return the {...} span starting at text[start] by counting braces in one
+    linear pass, skipping braces inside JSON strings. None if it never closes.
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+async def _stream_completion(**kwargs) -> str:
+    """Run a streamed chat completion and return the concatenated message content."""
+    stream = await client.chat.completions.create(stream=True, **kwargs)
+    parts = []
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+    return "".join(parts)
+
+# Cleared the first time the provider rejects response_format, so later calls skip the failed attempt
+_json_mode_supported = True
+
+def _rejects_json_mode(error: BadRequestError) -> bool:
+    """True when a 400 is about response_format itself, not e.g. a prompt that mentions JSON."""
+    if error.param == "response_format":
+        return True
+    if error.code in ("unsupported_parameter", "unsupported_value"):
+        return error.param in (None, "response_format")
+    return "response_format" in error.message
+
+async def _stream_json_completion(**kwargs) -> str:
+    """Stream a completion in JSON mode, downgrading to a plain completion if the provider rejects it."""
+    global _json_mode_supported
+    if _json_mode_supported:
+        try:
+            return await _stream_completion(response_format={"type": "json_object"}, **kwargs)
+        except BadRequestError as e:
+            if not _rejects_json_mode(e):
+                raise
+            logger.warning("Provider rejected JSON mode, continuing without it: %s", e)
+            _json_mode_supported = False
+    return await _stream_completion(**kwargs)
+
+async def aclose():
+    """Close the shared HTTP client (call on application shutdown)."""
+    await http_client.aclose()
+
+class EnhancedLLMHandler:
+    """Enhanced LLM handler for resume parsing with strict JSON validation and cleanup."""
+    
+    @staticmethod
+    def validate_json_response(response: str) -> tuple[bool, Optional[Dict], str]:
+        """Validate and clean JSON response from LLM."""
+        try:
+            # Try direct parsing first
+            parsed = orjson.loads(response)
+            return True, parsed, "Valid JSON"
+        except orjson.JSONDecodeError:
+            pass
+        
+        # Scan for the first balanced object (covers markdown fences and surrounding prose)
+        start = response.find("{")
+        while start != -1:
+            candidate = _balanced_object(response, start)
+            if candidate is None:
+                break
+            try:
+                parsed = orjson.loads(candidate)
+                source = "markdown" if "```" in response else "surrounding text"
+                return True, parsed, f"JSON extracted from {source}"
+            except orjson.JSONDecodeError:
+                # Resume after the failed object: a nested object is not the resume, and
+                # restarting at inner braces would make the scan quadratic
+                start = response.find("{", start + len(candidate))
+        
+        return False, None, f"No valid JSON found in response: {response[:200]}..."
+
+    @staticmethod
+    def clean_resume_json(parsed_json: dict) -> dict:
+        """Clean and standardize the LLM JSON output."""
+        
+        # Normalize education fields
+        for edu in parsed_json.get("education", []):
+            # Standardize GPA format
+            if "gpa" in edu and edu["gpa"]:
+                gpa_str = edu["gpa"].strip()
+                
+                # Convert percentage to X.X/100 format (only strings containing '%' can match)
+                if "%" in gpa_str:
+                    perc_match = _GPA_PERCENT_RE.search(gpa_str)
+                    if perc_match:
+                        edu["gpa"] = f"{perc_match.group(1)}/100"
+                
+                # Convert single number to /10 scale
+                elif _GPA_NUMBER_RE.fullmatch(gpa_str):
+                    edu["gpa"] = f"{gpa_str}/10"
+            
+            # Remove honors if it's empty or just GPA-related
+            if "honors" in edu:
+                honors = edu["honors"].strip()
+                if not honors or "cgpa" in honors.lower() or "gpa" in honors.lower():
+                    edu.pop("honors", None)
+        
+        # Remove empty optional fields at the top level
+        for key in ["linkedin", "github", "portfolio"]:
+            if key in parsed_json and (not parsed_json[key] or parsed_json[key].strip() == ""):
+                parsed_json.pop(key, None)
+        
+        return parsed_json
+
+    @staticmethod
+    def create_enhanced_prompt(resume_text: str, update_text: str = "", target_role: str = "software engineer") -> str:
+        """Create the per-resume user prompt; the invariant instructions live in _SYSTEM_PROMPT."""
+        update_section = _UPDATE_SECTION_TEMPLATE.format(update_text=update_text) if update_text else ""
+        return _USER_PROMPT_TEMPLATE.format_map({
+            "resume_text": resume_text,
+            "update_section": update_section,
+            "target_role": target_role,
+        })
+
+    async def call_llm_with_resume(self, resume_text: str, update_text: str = "", target_role: str = "") -> str:
         """Enhanced LLM call with error handling, retries, and post-processing."""
+        key = _response_cache_key(resume_text, update_text, target_role)
+        cached = _RESPONSE_CACHE.get(key)
+        if cached is not None:
+            _RESPONSE_CACHE.move_to_end(key)
+            logger.info("LLM response cache hit")
+            return cached
+        
         try:
             prompt = self.create_enhanced_prompt(resume_text, update_text, target_role)
 
-            response = client.chat.completions.create(
-                model="Meta-Llama-3.3-70B-Instruct",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a professional resume parser. Return only valid JSON without any markdown formatting or explanations."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
+            raw_response = await _stream_json_completion(
+                model=_MODEL,
+                messages=[_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
                 temperature=0.1,
                 top_p=0.1,
                 max_tokens=4000
             )
             
-            raw_response = response.choices[0].message.content
-            
             # Validate and clean the response
             is_valid, parsed_json, validation_msg = self.validate_json_response(raw_response)
             
             if is_valid:
                 cleaned_json = self.clean_resume_json(parsed_json)
-                return json.dumps(cleaned_json, indent=2)
+                result = orjson.dumps(cleaned_json, option=orjson.OPT_INDENT_2).decode()
             else:
                 # If validation fails, try a simpler prompt
-                return self._retry_with_simple_prompt(resume_text, update_text, validation_msg)
+                result = await self._retry_with_simple_prompt(resume_text, update_text, validation_msg)
                 
         except Exception as e:
             raise Exception(f"LLM processing failed: {str(e)}")
+        
+        _RESPONSE_CACHE[key] = result
+        if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+        return result
     
-    def _retry_with_simple_prompt(self, resume_text: str, update_text: str, error_msg: str) -> str:
+    async def _retry_with_simple_prompt(self, resume_text: str, update_text: str, error_msg: str) -> str:
         """Retry with a simpler, more focused prompt."""
-        simple_prompt = f"""Extract resume information and return as JSON only:
-
-Resume text:
-{resume_text[:2000]}  
-
-Return valid JSON with fields: name, email, phone, location, linkedin, github, summary, skills (array), experience (array with company, title, duration, description array), education (array with gpa and honors), projects (array), certifications (array).
-
-Rules:
-- GPA: X.X/10 or NN.N
-- Honors: Only real awards/distinctions
-- No empty strings, omit missing fields
-
-JSON only, no markdown:"""
+        simple_prompt = _SIMPLE_PROMPT_HEAD + resume_text[:2000] + _SIMPLE_PROMPT_TAIL
 
         try:
-            response = client.chat.completions.create(
-                model="Meta-Llama-3.3-70B-Instruct",
+            raw_response = await _stream_completion(
+                model=_MODEL,
                 messages=[{"role": "user", "content": simple_prompt}],
                 temperature=0.1,
                 max_tokens=3000
             )
             
-            raw_response = response.choices[0].message.content
             is_valid, parsed_json, _ = self.validate_json_response(raw_response)
             
             if is_valid:
                 cleaned_json = self.clean_resume_json(parsed_json)
-                return json.dumps(cleaned_json, indent=2)
+                return orjson.dumps(cleaned_json, option=orjson.OPT_INDENT_2).decode()
             else:
                 raise Exception(f"Both attempts failed. Original error: {error_msg}")
                 
         except Exception as e:
             raise Exception(f"Retry attempt failed: {str(e)}")
 
+# Shared handler instance reused by the factory function
+_default_handler = EnhancedLLMHandler()
+
 # Factory function for backward compatibility
-def call_llm_with_resume(self, resume_text: str, update_text: str = "", target_role: str = "") -> str:
+async def call_llm_with_resume(resume_text: str, update_text: str = "", target_role: str = "") -> str:
     """Backward compatible LLM handler function."""
-    handler = EnhancedLLMHandler()
-    return handler.call_llm_with_resume(resume_text, update_text, target_role)
+    return await _default_handler.call_llm_with_resume(resume_text, update_text, target_role)
@@ -1,21 +1,228 @@
+import asyncio
+import atexit
+import getpass
+import hashlib
 import os
 import re
+import shutil
+import stat
 import subprocess
 import logging
-from jinja2 import Environment, FileSystemLoader, Template
-from typing import Dict, Tuple, Optional
-from datetime import datetime
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+from typing import Dict, List, Tuple, Optional
 from functools import lru_cache
+from itertools import count, repeat
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Tectonic, when installed, replaces pdflatex: it reads the source on stdin and reruns itself as needed
+_TECTONIC = shutil.which("tectonic")
+# Engine name for messages and log headers
+_ENGINE = "tectonic" if _TECTONIC else "pdflatex"
+_LOG_HEADER = f"=== {_ENGINE.upper()} LOG ===\n"
+
+# pdflatex --version result, re-probed after the TTL so long-lived workers notice a (re)install
+_LATEX_CHECK_TTL = 3600.0
+_latex_check: Optional[Tuple[Tuple[bool, str], float]] = None
+
+def _latex_installed() -> Tuple[bool, str]:
+    global _latex_check
+    now = time.monotonic()
+    if _latex_check is not None and now - _latex_check[1] < _LATEX_CHECK_TTL:
+        return _latex_check[0]
+    try:
+        result = subprocess.run([_TECTONIC or _ENGINE, '--version'], capture_output=True, text=True, timeout=10)
+        status = (result.returncode == 0, result.stdout or result.stderr)
+    except FileNotFoundError:
+        status = (False, f"{_ENGINE} not found")
+    except subprocess.TimeoutExpired:
+        status = (False, f"{_ENGINE} check timed out")
+    _latex_check = (status, now)
+    return status
+
+# Parent for per-render pdflatex scratch dirs: tmpfs on Linux when writable, else the system temp dir
+_SCRATCH_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# Everything before this marker in the template is static and can be dumped into a format
+_ENDOFDUMP = r"\csname endofdump\endcsname"
+@lru_cache(maxsize=4)
+def _preamble_format(template_dir: str) -> Optional[str]:
+    """
+    Precompile the template preamble with mylatexformat, once per template directory, and check the
+    format on a trivial document with the full preamble. Returns the -fmt path, or None when no marker
+    is present or either step fails (renders then run plain pdflatex).
+    """
+    with open(os.path.join(template_dir, EnhancedPDFGenerator.TEMPLATE_NAME), encoding="utf-8") as f:
+        source = f.read()
+    if _ENDOFDUMP not in source:
+        return None
+    fmt_dir = tempfile.mkdtemp(prefix="resume_fmt_")
+    fmt = os.path.join(fmt_dir, "resume")
+    Path(fmt_dir, "preamble.tex").write_text(
+        source.split(_ENDOFDUMP, 1)[0] + "\\begin{document}\\end{document}\n", encoding="utf-8"
+    )
+    Path(fmt_dir, "check.tex").write_text(
+        source.split("\\begin{document}", 1)[0] + "\\begin{document}\nx\n\\end{document}\n", encoding="utf-8"
+    )
+    # (command, transcript it writes) for the format build and the check render
+    steps = (
+        (["pdflatex", "-ini", "-interaction=nonstopmode", "-halt-on-error", "-jobname=resume",
+          "&pdflatex", "mylatexformat.ltx", "preamble.tex"], "resume.log"),
+        (["pdflatex", f"-fmt={fmt}", "-interaction=nonstopmode", "-halt-on-error", "-no-shell-escape",
+          "check.tex"], "check.log"),
+    )
+    try:
+        for cmd, log_name in steps:
+            result = subprocess.run(cmd, cwd=fmt_dir, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, timeout=60)
+            if result.returncode != 0:
+                log_tail = EnhancedPDFGenerator._read_log(Path(fmt_dir, log_name))[-2000:]
+                logger.warning("Could not precompile LaTeX preamble (pdflatex exit %s):\n%s",
+                               result.returncode, log_tail.decode("utf-8", errors="replace"))
+                break
+        else:
+            if os.path.exists(fmt + ".fmt") and os.path.exists(os.path.join(fmt_dir, "check.pdf")):
+                # Kept for the life of the process, then removed with the rest of the build files
+                atexit.register(shutil.rmtree, fmt_dir, True)
+                return fmt
+            logger.warning("Could not precompile LaTeX preamble (no format or check PDF produced)")
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning("Could not precompile LaTeX preamble: %s", e)
+    shutil.rmtree(fmt_dir, ignore_errors=True)
+    return None
+
+# Concurrent async renders, capped at one TeX process per core; the rest wait without holding a thread
+_RENDER_SLOTS = asyncio.Semaphore(os.cpu_count() or 1)
+
+# Rendered PDF bytes keyed by a digest of the LaTeX source, least recently used first
+_PDF_CACHE: "OrderedDict[bytes, bytes]" = OrderedDict()
+_PDF_CACHE_SIZE = 64
+_PDF_CACHE_LOCK = threading.Lock()
+
+# Second-level cache on disk, shared by all uvicorn workers; oldest entries (by mtime) are evicted
+# No uid on Windows: name the directory after the user instead and skip the ownership check
+_UID = os.getuid() if hasattr(os, "getuid") else None
+_PDF_DISK_CACHE_DIR = Path(
+    os.getenv("PDF_CACHE_DIR")
+    or os.path.join(tempfile.gettempdir(), f"resume_pdf_cache-{_UID if _UID is not None else getpass.getuser()}")
+)
+_PDF_DISK_CACHE_FILES = 256
+# Eviction scans the directory only every this many puts, so it may briefly overshoot the limit
+_PDF_DISK_CACHE_PRUNE_EVERY = 32
+_disk_cache_puts = count()
+
+@lru_cache(maxsize=1)
+def _disk_cache_ready() -> bool:
+    """Create the cache directory private to this user; refuse one owned by someone else."""
+    try:
+        _PDF_DISK_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(_PDF_DISK_CACHE_DIR)
+        if not stat.S_ISDIR(st.st_mode) or (_UID is not None and st.st_uid != _UID):
+            logger.warning("On-disk PDF cache disabled: %s is not a directory owned by this user",
+                           _PDF_DISK_CACHE_DIR)
+            return False
+        if _UID is not None and stat.S_IMODE(st.st_mode) != 0o700:
+            os.chmod(_PDF_DISK_CACHE_DIR, 0o700)
+    except OSError as e:
+        logger.warning("On-disk PDF cache disabled: %s", e)
+        return False
+    return True
+
+def _disk_cache_get(key: bytes) -> Optional[bytes]:
+    if not _disk_cache_ready():
+        return None
+    path = _PDF_DISK_CACHE_DIR / f"{key.hex()}.pdf"
+    try:
+        pdf_bytes = path.read_bytes()
+        os.utime(path)
+    except OSError:
+        return None
+    return pdf_bytes
+
+def _disk_cache_put(key: bytes, pdf_bytes: bytes):
+    if not _disk_cache_ready():
+        return
+    try:
+        # Write under a unique name and rename, so other workers never read a partial PDF
+        fd, tmp = tempfile.mkstemp(suffix=".part", dir=_PDF_DISK_CACHE_DIR)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp, _PDF_DISK_CACHE_DIR / f"{key.hex()}.pdf")
+        if next(_disk_cache_puts) % _PDF_DISK_CACHE_PRUNE_EVERY:
+            return
+        entries = [e for e in os.scandir(_PDF_DISK_CACHE_DIR) if e.name.endswith(".pdf")]
+        if len(entries) > _PDF_DISK_CACHE_FILES:
+            entries.sort(key=lambda e: e.stat().st_mtime)
+            for entry in entries[:len(entries) - _PDF_DISK_CACHE_FILES]:
+                os.unlink(entry.path)
+    except OSError as e:
+        logger.warning("Could not update on-disk PDF cache: %s", e)
 
 class EnhancedPDFGenerator:
     """Enhanced PDF generator with robust LaTeX escaping and data cleaning."""
     
-    # Pre-compile regex patterns
-    URL_PATTERN = re.compile(r'^(http://|https://|www\.|mailto:)', re.IGNORECASE)
-    LATEX_ESCAPE_PATTERN = None  # Will be set in __init__
+    # Keys whose string values are URLs/handles and must not be escaped
+    NO_ESCAPE_KEYS = frozenset({"website", "linkedin", "github", "portfolio", "link"})
+    
+    # Case-insensitive URL prefixes; the longest is 8 chars, so only that slice is lowercased
+    URL_PREFIXES = ('http://', 'https://', 'www.', 'mailto:')
+    # First characters of URL_PREFIXES in either case; rejects most strings before lowercasing
+    URL_INITIALS = frozenset('hHwWmM')
+    
+    LATEX_ESCAPE = MappingProxyType({
+        '&': r'\&',
+        '%': r'\%',
+        '$': r'\$',
+        '#': r'\#',
+        '_': r'\_',
+        '{': r'\{',
+        '}': r'\}',
+        '~': r'\textasciitilde{}',
+        '^': r'\^{}',
+        '\\': r'\textbackslash{}'
+    })
+    # Dash/smart-quote normalization (outputs contain no LaTeX specials, so both fold into one table)
+    TYPOGRAPHIC_REPLACEMENTS = MappingProxyType({
+        '\u2013': '-',     # En dash
+        '\u2014': '---',   # Em dash
+        '\u2018': "'",     # Smart single quote (left)
+        '\u2019': "'",     # Smart single quote (right)
+        '\u201c': '"',     # Smart double quote (left)
+        '\u201d': '"',     # Smart double quote (right)
+    })
+    LATEX_REPLACEMENTS = MappingProxyType({**TYPOGRAPHIC_REPLACEMENTS, **LATEX_ESCAPE})
+    # One character class over everything rewritten; strings without a match come back unchanged
+    LATEX_RE = re.compile("[" + "".join(map(re.escape, LATEX_REPLACEMENTS)) + "]")
+    
+    # Short strings (skills, titles, dates) repeat across resumes and are memoized; long ones rarely repeat
+    ESCAPE_CACHE_MAX_LEN = 64
+    
+    # Commands whose output depends on a previous pass's .aux
+    MULTIPASS_COMMANDS = ("\\ref{", "\\pageref{", "\\tableofcontents", "\\cite{")
+    
+    # pdflatex log messages asking for another pass
+    RERUN_MARKERS = (b"Rerun to get", b"Label(s) may have changed")
+    
+    # Compiled templates keyed by Environment (one per template directory)
+    _TEMPLATE_CACHE: Dict[Environment, Template] = {}
+    TEMPLATE_NAME = "resume_template.tex.j2"
+    
+    # Top-level resume fields cleaned as plain strings / string lists
+    SCALAR_FIELDS = ('name', 'email', 'phone', 'location', 'linkedin', 'github', 'portfolio', 'summary')
+    LIST_FIELDS = ('skills', 'certifications')
+    # (section, item fields in output order, fields of which at least one must be present)
+    SECTIONS = (
+        ('experience', ('company', 'title', 'duration', 'location', 'description'), ('company', 'title')),
+        ('education', ('institution', 'degree', 'duration', 'location', 'gpa', 'honors'), ('institution', 'degree')),
+        ('projects', ('title', 'description', 'tech_stack', 'link'), ('title', 'description')),
+    )
     
     def __init__(self, template_path: str = None):
         base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -31,250 +238,288 @@ class EnhancedPDFGenerator:
                 f"Template directory not found: {self.template_path}"
             )
         
-        self.latex_escape = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\^{}',
-            '\\': r'\textbackslash{}'
-        }
-        
-        # Pre-compile the regex pattern
-        self.__class__.LATEX_ESCAPE_PATTERN = re.compile('|'.join(re.escape(c) for c in self.latex_escape))
-        
-        self.no_escape_keys = frozenset({"website", "linkedin", "github", "portfolio", "link"})
-        
-        # Initialize Jinja environment once
-        self.env = Environment(
-            loader=FileSystemLoader(self.template_path),
-            block_start_string='((*', 
-            block_end_string='*))',
-            variable_start_string='(((', 
-            variable_end_string=')))',
-            comment_start_string='((#', 
-            comment_end_string='#))',
-            trim_blocks=True, 
-            lstrip_blocks=True, 
-            autoescape=False
-        )
-        self.env.filters['batch'] = self._batch_filter
-        
-        # Cache the template
-        self._template = self.env.get_template("resume_template.tex.j2")
+        # Environment and compiled template are shared by every generator using this directory
+        self.env = _get_env(os.path.abspath(self.template_path))
+        self._template = self._get_template(self.env)
+
+    @classmethod
+    def _get_template(cls, env: Environment) -> Template:
+        template = cls._TEMPLATE_CACHE.get(env)
+        if template is None:
+            template = cls._TEMPLATE_CACHE[env] = env.get_template(cls.TEMPLATE_NAME)
+        return template
 
-    @lru_cache(maxsize=1024)
-    def escape_latex(self, text: str) -> str:
-        """Escape LaTeX special characters with caching."""
+    @staticmethod
+    def escape_latex(text: str) -> str:
+        """Escape LaTeX special characters, memoizing short strings."""
         if not text or not isinstance(text, str):
             return text
-
-        # First replace special characters using string replacement
-        replacements = {
-            "–": "-",     # En dash
-            "—": "---",   # Em dash
-            "'": "'",     # Smart single quote (left)
-            "'": "'",     # Smart single quote (right)
-            """: "\"",    # Smart double quote (left)
-            """: "\""     # Smart double quote (right)
-        }
-        
-        # Replace special characters one by one
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-
-        # Then escape LaTeX special characters
-        return self.LATEX_ESCAPE_PATTERN.sub(lambda m: self.latex_escape[m.group()], text)
-
-    def _is_url(self, text: str) -> bool:
-        return isinstance(text, str) and bool(self.URL_PATTERN.match(text))
+        if len(text) < EnhancedPDFGenerator.ESCAPE_CACHE_MAX_LEN:
+            return _escape_latex_cached(text)
+        return EnhancedPDFGenerator._escape_latex_uncached(text)
 
     @staticmethod
-    def _clean_str(val: str) -> Optional[str]:
-        return val.strip() if isinstance(val, str) and val.strip() else None
+    def _escape_latex_uncached(text: str) -> str:
+        # Normalize dashes/quotes and escape specials in a single pass; faster than str.translate,
+        # which drops off its ASCII fast path at the first multi-character replacement
+        return EnhancedPDFGenerator.LATEX_RE.sub(_latex_replacement, text)
 
     @staticmethod
-    def _clean_list(lst):
+    def _is_url(text: str) -> bool:
+        return (isinstance(text, str) and text[:1] in EnhancedPDFGenerator.URL_INITIALS
+                and text[:8].lower().startswith(EnhancedPDFGenerator.URL_PREFIXES))
+
+    def _leaf(self, val, key: str, escape: bool) -> Optional[str]:
+        """Strip a string leaf (None if empty), LaTeX-escaping it when requested."""
+        if not isinstance(val, str):
+            return None
+        val = val.strip()
+        if not val:
+            return None
+        if escape and key not in self.NO_ESCAPE_KEYS and not self._is_url(val):
+            return self.escape_latex(val)
+        return val
+
+    def _leaves(self, lst, key: str, escape: bool) -> List[str]:
         if not isinstance(lst, list):
             return []
-        return [x.strip() for x in lst if isinstance(x, str) and x.strip()]
+        # map() drives the per-item calls from C; filter(None) drops the empties
+        return list(filter(None, map(self._leaf, lst, repeat(key), repeat(escape))))
+
+    def _entry(self, src: Dict, keys: Tuple[str, ...], escape: bool) -> Dict:
+        """Cleaned non-empty string fields of one experience/education/project item, in ``keys`` order."""
+        leaf = self._leaf
+        get = src.get
+        entry = {}
+        for k in keys:
+            if k == 'description':
+                desc = get(k, [])
+                v = self._leaves([desc] if isinstance(desc, str) else desc, k, escape) or None
+            else:
+                v = leaf(get(k), k, escape)
+            if v:
+                entry[k] = v
+        return entry
+
+    @staticmethod
+    def _has_text(val, key: str) -> bool:
+        """Whether _entry would keep ``val`` for ``key``, checked without cleaning it."""
+        if key == 'description' and isinstance(val, list):
+            return any(isinstance(v, str) and v and not v.isspace() for v in val)
+        return isinstance(val, str) and bool(val) and not val.isspace()
 
     # ---------------------------
     # Resume Data Cleaning
     # ---------------------------
-    def validate_resume_data(self, resume_data: Dict) -> Dict:
-        """Validate, normalize, and deeply clean resume data to avoid empty LaTeX sections."""
-        
+    def _normalize_resume_data(self, resume_data: Dict, escape: bool) -> Dict:
+        """
+        One walk over the resume that validates, strips, drops empty values and
+        (optionally) LaTeX-escapes every leaf, instead of separate validation,
+        pruning and escaping passes.
+        """
+        # Bound methods hoisted to locals for the loops below
+        get = resume_data.get
+        leaf, leaves, make_entry, has_text = self._leaf, self._leaves, self._entry, self._has_text
+        data = {'name': leaf(get('name'), 'name', escape) or 'Name Not Provided'}
+        for k in self.SCALAR_FIELDS[1:]:
+            v = leaf(get(k), k, escape)
+            if v:
+                data[k] = v
+        for k in self.LIST_FIELDS:
+            v = leaves(get(k, []), k, escape)
+            if v:
+                data[k] = v
 
-        cleaned_data = {
-            'name': self._clean_str(resume_data.get('name')) or 'Name Not Provided',
-            'email': self._clean_str(resume_data.get('email')) or '',
-            'phone': self._clean_str(resume_data.get('phone')) or '',
-            'location': self._clean_str(resume_data.get('location')) or '',
-            'linkedin': self._clean_str(resume_data.get('linkedin')) or '',
-            'github': self._clean_str(resume_data.get('github')) or '',
-            'portfolio': self._clean_str(resume_data.get('portfolio')) or '',
-            'summary': self._clean_str(resume_data.get('summary')) or '',
-            'skills': self._clean_list(resume_data.get('skills', [])),
-            'certifications': self._clean_list(resume_data.get('certifications', [])),
-        }
-
-        # --- Experience ---
-        cleaned_experience = []
-        for exp in resume_data.get('experience', []):
-            if isinstance(exp, dict):
-                desc = exp.get('description', [])
-                if isinstance(desc, str):
-                    desc = [desc]
-                if isinstance(desc, list):
-                    desc = self._clean_list(desc)
-                
-                cleaned_exp = {
-                    'company': self._clean_str(exp.get('company')) or '',
-                    'title': self._clean_str(exp.get('title')) or '',
-                    'duration': self._clean_str(exp.get('duration')) or '',
-                    'location': self._clean_str(exp.get('location')) or '',
-                    'description': desc,
-                }
-                if cleaned_exp['company'] or cleaned_exp['title']:
-                    cleaned_experience.append(cleaned_exp)
-        cleaned_data['experience'] = cleaned_experience
-
-        # --- Education ---
-        cleaned_education = []
-        for edu in resume_data.get('education', []):
-            if isinstance(edu, dict):
-                cleaned_edu = {
-                    'institution': self._clean_str(edu.get('institution')) or '',
-                    'degree': self._clean_str(edu.get('degree')) or '',
-                    'duration': self._clean_str(edu.get('duration')) or '',
-                    'location': self._clean_str(edu.get('location')) or '',
-                    'gpa': self._clean_str(edu.get('gpa')) or '',
-                    'honors': self._clean_str(edu.get('honors')) or '',
-                }
-                if cleaned_edu['institution'] or cleaned_edu['degree']:
-                    cleaned_education.append(cleaned_edu)
-        cleaned_data['education'] = cleaned_education
-
-        # --- Projects ---
-        cleaned_projects = []
-        for proj in resume_data.get('projects', []):
-            if isinstance(proj, dict):
-                desc = proj.get('description', [])
-                if isinstance(desc, str):
-                    desc = [desc]
-                if isinstance(desc, list):
-                    desc = self._clean_list(desc)
-                
-                cleaned_proj = {
-                    'title': self._clean_str(proj.get('title')) or '',
-                    'description': desc,
-                    'tech_stack': self._clean_str(proj.get('tech_stack')) or '',
-                    'link': self._clean_str(proj.get('link')) or '',
-                }
-                if cleaned_proj['title'] or cleaned_proj['description']:
-                    cleaned_projects.append(cleaned_proj)
-        cleaned_data['projects'] = cleaned_projects
-
-        # Optional: recursively remove empty lists/dicts
-        return self._remove_empty(cleaned_data)
-
-    def _remove_empty(self, obj):
-        """Recursively remove empty lists, dicts, and strings."""
-        if isinstance(obj, dict):
-            return {k: self._remove_empty(v) for k, v in obj.items() if v not in [None, '', [], {}]}
-        elif isinstance(obj, list):
-            return [self._remove_empty(v) for v in obj if v not in [None, '', [], {}]]
-        else:
-            return obj
-
-    def preprocess_resume_data(self, data, parent_key=None):
-        """Recursively escape LaTeX characters with improved handling."""
-        if isinstance(data, dict):
-            return {k: self.preprocess_resume_data(v, k) for k, v in data.items()}
-        elif isinstance(data, list):
-            return [self.preprocess_resume_data(v, parent_key) for v in data]
-        elif isinstance(data, str):
-            if parent_key in self.no_escape_keys or self._is_url(data):
-                return data
-            return self.escape_latex(data)
+        for section, keys, required in self.SECTIONS:
+            items = []
+            for item in get(section, []):
+                # Check the required fields on the raw item, so empty records are never cleaned
+                if isinstance(item, dict) and any(has_text(item.get(k), k) for k in required):
+                    items.append(make_entry(item, keys, escape))
+            if items:
+                data[section] = items
         return data
 
+    def validate_resume_data(self, resume_data: Dict) -> Dict:
+        """Validate, normalize, and deeply clean resume data to avoid empty LaTeX sections."""
+        return self._normalize_resume_data(resume_data, escape=False)
+
     # ---------------------------
     # LaTeX Rendering
     # ---------------------------
     def generate_latex_from_resume(self, resume_data: Dict) -> str:
-        logging.info("Preprocessing resume data...")
-        resume_data = self.preprocess_resume_data(self.validate_resume_data(resume_data))
+        logger.debug("Preprocessing resume data...")
+        resume_data = self._normalize_resume_data(resume_data, escape=True)
         return self._template.render(**resume_data)
 
-    def _batch_filter(self, items, size):
-        return [items[i:i + size] for i in range(0, len(items), size)] if items else []
-
     # ---------------------------
     # PDF Rendering
     # ---------------------------
     def check_latex_installation(self) -> Tuple[bool, str]:
+        return _latex_installed()
+
+    @staticmethod
+    def _read_log(log_file: Path) -> bytes:
         try:
-            result = subprocess.run(['pdflatex', '--version'], capture_output=True, text=True, timeout=10)
-            return (result.returncode == 0, result.stdout or result.stderr)
-        except FileNotFoundError:
-            return False, "pdflatex not found"
-        except subprocess.TimeoutExpired:
-            return False, "pdflatex check timed out"
+            with open(log_file, "rb") as f:
+                return f.read()
+        except OSError:
+            return b""
+
+    @staticmethod
+    def _compile_tectonic(tex_bytes: bytes) -> Tuple[bytes, bytes]:
+        """Run Tectonic on the source and return (pdf bytes or b"", console output)."""
+        with tempfile.TemporaryDirectory(prefix="resume_", dir=_SCRATCH_ROOT) as scratch:
+            process = subprocess.run(
+                [_TECTONIC, "--chatter", "minimal", "--outdir", scratch, "-"],
+                input=tex_bytes, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=60
+            )
+            try:
+                # Source read from stdin is named texput, as with TeX itself
+                return Path(scratch, "texput.pdf").read_bytes(), process.stdout
+            except FileNotFoundError:
+                return b"", process.stdout
+
+    def _compile(self, tex_content: str, tex_bytes: bytes, base_name: str, fmt: Optional[str]) -> Tuple[bytes, bytes]:
+        """Run pdflatex on the source and return (pdf bytes or b"", log bytes)."""
+        # Compile in a throwaway scratch directory (RAM-backed where available) so pdflatex's
+        # many small aux/log writes never touch persistent storage; only the PDF is copied out
+        with tempfile.TemporaryDirectory(prefix="resume_", dir=_SCRATCH_ROOT) as scratch:
+            scratch_dir = Path(scratch)
+            tex_path = scratch_dir / f"{base_name}.tex"
+            # Encode once and write in a single call, bypassing the buffered text layer
+            tex_path.write_bytes(tex_bytes)
+
+            # Run pdflatex with optimized parameters
+            cmd = ["pdflatex", "-interaction=nonstopmode", "-file-line-error", "-no-shell-escape",
+                   "-halt-on-error", "-output-directory", scratch, str(tex_path)]
+            if fmt:
+                cmd.insert(1, f"-fmt={fmt}")
+            # Console output is discarded; pdflatex writes the same transcript to its .log file
+            log_file = scratch_dir / f"{base_name}.log"
+            if any(command in tex_content for command in self.MULTIPASS_COMMANDS):
+                # References need a pass to write the .aux; -draftmode skips producing the PDF in it
+                subprocess.run(cmd[:1] + ["-draftmode"] + cmd[1:], stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, timeout=30)
+            process = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+            log_bytes = self._read_log(log_file)
+            
+            # One pass converges for the resume template; rerun only if LaTeX reports unresolved references
+            if process.returncode == 0 and any(marker in log_bytes for marker in self.RERUN_MARKERS):
+                process = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+                log_bytes = self._read_log(log_file)
+
+            try:
+                return (scratch_dir / f"{base_name}.pdf").read_bytes(), log_bytes
+            except FileNotFoundError:
+                return b"", log_bytes
 
     def render_resume_to_pdf(self, resume_data: Dict, output_dir: str, return_log=False):
         try:
             # Ensure output directory exists
-            os.makedirs(output_dir, exist_ok=True)
+            out = Path(output_dir)
+            out.mkdir(parents=True, exist_ok=True)
             
-            # Use more efficient file naming
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            base_name = f"resume_{timestamp}"
-            tex_file = os.path.join(output_dir, f"{base_name}.tex")
-            pdf_file = os.path.join(output_dir, f"{base_name}.pdf")
+            # Random name: timestamps collide when two renders finish in the same second
+            base_name = f"resume_{uuid.uuid4().hex[:12]}"
+            pdf_path = out / f"{base_name}.pdf"
+            pdf_file = str(pdf_path)
 
             # Generate LaTeX content
             tex_content = self.generate_latex_from_resume(resume_data)
             
-            # Use context manager for file operations
-            with open(tex_file, "w", encoding="utf-8") as f:
-                f.write(tex_content)
+            tex_bytes = tex_content.encode("utf-8")
+            
+            # Identical LaTeX source renders to the same PDF; reuse it instead of running pdflatex
+            cache_key = hashlib.blake2b(tex_bytes, digest_size=16).digest()
+            with _PDF_CACHE_LOCK:
+                cached_pdf = _PDF_CACHE.get(cache_key)
+                if cached_pdf is not None:
+                    _PDF_CACHE.move_to_end(cache_key)
+            if cached_pdf is None:
+                cached_pdf = _disk_cache_get(cache_key)
+                if cached_pdf is not None:
+                    with _PDF_CACHE_LOCK:
+                        _PDF_CACHE[cache_key] = cached_pdf
+                        if len(_PDF_CACHE) > _PDF_CACHE_SIZE:
+                            _PDF_CACHE.popitem(last=False)
+            if cached_pdf is not None:
+                logger.debug("PDF cache hit")
+                pdf_path.write_bytes(cached_pdf)
+                return (pdf_file, _LOG_HEADER + "(reused cached render)") if return_log else pdf_file
+            
+            if _TECTONIC:
+                pdf_bytes, log_bytes = self._compile_tectonic(tex_bytes)
+            else:
+                # Preamble precompiled into a pdflatex format (built and checked on first use) so only
+                # the body is typeset; a failure with a checked format is down to the content itself
+                fmt = _preamble_format(os.path.abspath(self.template_path))
+                pdf_bytes, log_bytes = self._compile(tex_content, tex_bytes, base_name, fmt)
 
-            # Run pdflatex with optimized parameters
-            process = subprocess.run(
-                ["pdflatex", "-interaction=nonstopmode", "-file-line-error", 
-                 "-halt-on-error", "-output-directory", output_dir, tex_file],
-                capture_output=True,
-                text=True,
-                timeout=30
+            # Decode the transcript only when the caller wants it
+            log_content = (
+                _LOG_HEADER + log_bytes.decode("utf-8", errors="replace")
+                if return_log else None
             )
 
-            log_content = f"=== PDFLATEX OUTPUT ===\n{process.stdout}\n{process.stderr}"
-
-            if not os.path.exists(pdf_file) or os.path.getsize(pdf_file) == 0:
+            if not pdf_bytes:
                 return (None, log_content) if return_log else None
 
-            # Clean up in a single loop
-            for ext in ['.aux', '.log', '.out', '.tex']:
-                try:
-                    aux_file = os.path.join(output_dir, f"{base_name}{ext}")
-                    if os.path.exists(aux_file):
-                        os.unlink(aux_file)
-                except OSError:
-                    pass
+            pdf_path.write_bytes(pdf_bytes)
+            with _PDF_CACHE_LOCK:
+                _PDF_CACHE[cache_key] = pdf_bytes
+                if len(_PDF_CACHE) > _PDF_CACHE_SIZE:
+                    _PDF_CACHE.popitem(last=False)
+            _disk_cache_put(cache_key, pdf_bytes)
 
             return (pdf_file, log_content) if return_log else pdf_file
 
         except Exception as e:
             error_msg = f"PDF generation failed: {str(e)}"
-            logging.error(error_msg)
+            logger.error(error_msg)
             return (None, error_msg) if return_log else None
 
+    async def arender_resume_to_pdf(self, resume_data: Dict, output_dir: str, return_log=False):
+        """Render in a worker thread so the event loop keeps serving while pdflatex runs."""
+        async with _RENDER_SLOTS:
+            return await asyncio.to_thread(self.render_resume_to_pdf, resume_data, output_dir, return_log)
+
+@lru_cache(maxsize=8192)
+def _escape_latex_cached(text: str) -> str:
+    return EnhancedPDFGenerator._escape_latex_uncached(text)
+
+def _latex_replacement(match: "re.Match") -> str:
+    return EnhancedPDFGenerator.LATEX_REPLACEMENTS[match.group()]
+
+@lru_cache(maxsize=4)
+def _get_env(template_path: str) -> Environment:
+    """Build the Jinja environment (LaTeX-friendly delimiters) once per template directory."""
+    env = Environment(
+        loader=FileSystemLoader(template_path),
+        block_start_string='((*', 
+        block_end_string='*))',
+        variable_start_string='(((', 
+        variable_end_string=')))',
+        comment_start_string='((#', 
+        comment_end_string='#))',
+        trim_blocks=True, 
+        lstrip_blocks=True, 
+        autoescape=False,
+        # Templates ship with the code; don't stat() the source on every lookup
+        auto_reload=False,
+        # Persist compiled template code across worker restarts (per-user temp dir)
+        bytecode_cache=FileSystemBytecodeCache()
+    )
+    return env
+
+@lru_cache(maxsize=1)
+def _default_generator() -> EnhancedPDFGenerator:
+    """Build the shared generator once so the Jinja template is loaded a single time."""
+    return EnhancedPDFGenerator()
+
 # Factory function
 def render_resume_to_pdf(resume_data: Dict, output_dir: str, return_log: bool = False):
-    return EnhancedPDFGenerator().render_resume_to_pdf(resume_data, output_dir, return_log)
+    return _default_generator().render_resume_to_pdf(resume_data, output_dir, return_log)
+
+async def arender_resume_to_pdf(resume_data: Dict, output_dir: str, return_log: bool = False):
+    return await _default_generator().arender_resume_to_pdf(resume_data, output_dir, return_log)
@@ -1,9 +1,40 @@
+import os
 import subprocess
+import logging
+from typing import Optional
+
+try:
+    import clamd  # client for the clamd daemon, which keeps signatures loaded between scans
+except ImportError:
+    clamd = None
+
+logger = logging.getLogger(__name__)
+
+_CLAMD_SOCKET = os.getenv("CLAMD_SOCKET", "/var/run/clamav/clamd.ctl")
+_clamd_client = None
+
+def _scan_with_clamd(file_path: str) -> Optional[bool]:
+    """Stream the file to clamd; None when the daemon (or its client library) is unavailable."""
+    global _clamd_client
+    if clamd is None:
+        return None
+    try:
+        if _clamd_client is None:
+            _clamd_client = clamd.ClamdUnixSocket(path=_CLAMD_SOCKET)
+        with open(file_path, "rb") as f:
+            status, _ = _clamd_client.instream(f)["stream"]
+    except (clamd.ClamdError, OSError) as e:
+        logger.debug("clamd scan failed, falling back to clamscan: %s", e)
+        return None
+    return status == "OK"
 
 def scan_file_clamav(file_path: str) -> bool:
+    clean = _scan_with_clamd(file_path)
+    if clean is not None:
+        return clean
     try:
         result = subprocess.run(["clamscan", file_path], stdout=subprocess.PIPE)
-        return "Infected files: 0" in result.stdout.decode()
+        return b"Infected files: 0" in result.stdout
     except Exception as e:
-        print(f"ClamAV scan failed: {e}")
+        logger.warning("ClamAV scan failed: %s", e)
         return False